@@ -1,16 +1,71 @@
 import boto3
+import atexit
+import queue
 import time
 import os
 import json
+import random
+import sqlite3
 import argparse
+import threading
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait)
 from datetime import datetime, timezone
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 import logging
+import logging.handlers
+import ijson
 from dotenv import load_dotenv
 
+__all__ = ['AwsConfig', 'GlacierCleanup', 'GlacierStateManager',
+           'get_account_id', 'load_aws_credentials', 'setup_logging']
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Default state database, and the JSON state file used by earlier versions
+DEFAULT_STATE_FILE = 'glacier_state.db'
+LEGACY_STATE_FILE = 'glacier_state.json'
+
+# Bytes of the state database SQLite may memory-map instead of reading
+STATE_MMAP_SIZE = 256 * 1024 * 1024
+
+# Environment variables holding AWS credentials
+REQUIRED_CREDENTIAL_VARS = ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY')
+OPTIONAL_CREDENTIAL_VARS = ('AWS_SESSION_TOKEN', 'AWS_DEFAULT_REGION')
+
+# Default number of archive deletions issued concurrently across all vaults
+MAX_ARCHIVE_WORKERS = 32
+
+# Seconds to wait for a connection to Glacier, and for each read from it
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+# Number of vaults processed concurrently
+MAX_VAULT_WORKERS = 16
+
+# Seconds between saves of archive deletion progress to the state file
+PROGRESS_SAVE_INTERVAL = 60
+
+# Error codes that persist after the client's own retries are exhausted and
+# mean the request should be tried again on a later run
+RETRYABLE_ERROR_CODES = ('ThrottlingException', 'ServiceUnavailableException',
+                         'RequestTimeoutException')
+
+# Bytes read from the inventory response stream per parser refill
+INVENTORY_READ_SIZE = 1024 * 1024
+
+# Seconds before a job checked by an earlier run is checked again
+MIN_POLL_INTERVAL = 300
+
+# Backoff bounds (seconds) between job status checks in --wait mode; the
+# cap matches AWS's recommended 15 minute polling interval
+INITIAL_POLL_DELAY = 60
+MAX_POLL_DELAY = 900
+
 
 def setup_logging(debug=False, log_file=None):
     """Configure logging to output to both file and console."""
@@ -30,7 +85,6 @@ def setup_logging(debug=False, log_file=None):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
     console_handler.setLevel(log_level)
-    root_logger.addHandler(console_handler)
 
     # File handler
     if log_file is None:
@@ -44,15 +98,46 @@ def setup_logging(debug=False, log_file=None):
     file_handler = logging.FileHandler(log_file)
     file_handler.setFormatter(file_formatter)
     file_handler.setLevel(log_level)
-    root_logger.addHandler(file_handler)
+
+    # Worker threads only enqueue records; a single listener thread does the
+    # console and file I/O so logging doesn't serialize parallel deletes
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
     logger.debug("Logging initialized: console and file (%s)", log_file)
 
 
+def get_error_code(error):
+    """Return the AWS error code from a ClientError, if the response has one."""
+    return (error.response or {}).get('Error', {}).get('Code')
+
+
+@dataclass(frozen=True)
+class AwsConfig:
+    """AWS credentials and default region, read once from the environment."""
+    access_key: str
+    secret_key: str = field(repr=False)
+    session_token: str = field(default=None, repr=False)
+    region: str = None
+
+    def create_session(self, region_name=None):
+        """Create a boto3 session from these credentials."""
+        return boto3.Session(
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            aws_session_token=self.session_token,
+            region_name=region_name or self.region or 'us-east-1'
+        )
+
+
 def load_aws_credentials():
     """
     Load AWS credentials from environment variables or .env file.
-    Returns True if credentials are found, False otherwise.
+    Returns an AwsConfig if the required variables are found, None otherwise.
     """
     # Try to load .env file if it exists
     env_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -62,111 +147,313 @@ def load_aws_credentials():
     else:
         logger.debug("No .env file found at: %s", env_file)
 
-    # Check for required AWS credentials
-    required_vars = ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY']
-    optional_vars = ['AWS_SESSION_TOKEN', 'AWS_DEFAULT_REGION']
-
-    # Debug credential presence and format
-    for var in required_vars + optional_vars:
-        value = os.getenv(var)
-        if value:
-            logger.debug("%s is set (length: %d)", var, len(value))
-            # Show first 4 and last 4 characters if value is long enough
-            if len(value) > 8:
-                logger.debug("%s preview: %s...%s", var, value[:4], value[-4:])
-        else:
-            logger.debug("%s is not set", var)
+    # Read each variable once
+    credentials = {var: os.environ.get(var)
+                   for var in REQUIRED_CREDENTIAL_VARS + OPTIONAL_CREDENTIAL_VARS}
+
+    # Debug credential presence without logging any part of the values
+    if logger.isEnabledFor(logging.DEBUG):
+        for var, value in credentials.items():
+            if value:
+                logger.debug("%s is set (length: %d)", var, len(value))
+            else:
+                logger.debug("%s is not set", var)
 
     # Check required variables
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = [var for var in REQUIRED_CREDENTIAL_VARS
+                    if not credentials[var]]
     if missing_vars:
         logger.error("Missing required AWS credentials: %s",
                      ', '.join(missing_vars))
         logger.error("Please set them in your environment or .env file")
-        return False
+        return None
 
     logger.debug("AWS credentials validation completed successfully")
-    return True
+    return AwsConfig(
+        access_key=credentials['AWS_ACCESS_KEY_ID'],
+        secret_key=credentials['AWS_SECRET_ACCESS_KEY'],
+        session_token=credentials['AWS_SESSION_TOKEN'] or None,
+        region=credentials['AWS_DEFAULT_REGION'] or None
+    )
+
+
+def get_account_id(aws_config, region_name=None):
+    """Verify the credentials with STS and return their AWS account ID."""
+    sts = aws_config.create_session(region_name).client('sts')
+    return sts.get_caller_identity()['Account']
 
 
 class GlacierStateManager:
     """Manages the state of Glacier vault deletion process."""
 
-    def __init__(self, state_file):
-        """Initialize with path to state file."""
-        self.state_file = state_file
-        self.state = self.load_state()
+    def __init__(self, state_file, legacy_state_file=None):
+        """Open (or create) the SQLite state database at state_file.
 
-    def load_state(self):
-        """Load state from file or create new if doesn't exist."""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                logger.error("Error reading state file. Creating new state.")
-                return {}
-        return {}
-
-    def save_state(self):
-        """Save current state to file."""
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2)
-        logger.debug("State saved to %s", self.state_file)
+        JSON state files written by earlier versions are imported: either
+        state_file itself, which is kept as state_file + '.bak', or
+        legacy_state_file when state_file doesn't exist yet.
+        """
+        self.state_file = state_file
+        # Serializes use of the shared connection when vaults are processed
+        # in parallel
+        self.lock = threading.RLock()
+        self._batch_depth = 0
+
+        json_file = None
+        if os.path.exists(state_file) and not self._is_sqlite(state_file):
+            json_file = state_file + '.bak'
+            os.replace(state_file, json_file)
+        elif (legacy_state_file and not os.path.exists(state_file)
+              and os.path.exists(legacy_state_file)):
+            json_file = legacy_state_file
+
+        # Autocommit mode: each change is its own small transaction unless a
+        # batch() is open. WAL journaling keeps those commits cheap.
+        self.conn = sqlite3.connect(
+            state_file, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Read pages straight from a memory map rather than copying them
+        # through read() calls
+        self.conn.execute(f"PRAGMA mmap_size={STATE_MMAP_SIZE}")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS vaults (
+                vault_id TEXT PRIMARY KEY,
+                job_id TEXT,
+                status TEXT,
+                job_updated TEXT,
+                job_updated_epoch REAL,
+                last_polled REAL
+            );
+            CREATE TABLE IF NOT EXISTS archives (
+                vault_id TEXT NOT NULL,
+                archive_id TEXT NOT NULL,
+                description TEXT,
+                size INTEGER,
+                PRIMARY KEY (vault_id, archive_id)
+            ) WITHOUT ROWID;
+        """)
+
+        if json_file:
+            self._import_json(json_file)
+
+    @staticmethod
+    def _is_sqlite(path):
+        """Return True if path is an SQLite database (or empty)."""
+        with open(path, 'rb') as f:
+            header = f.read(16)
+        return not header or header == b'SQLite format 3\x00'
+
+    def _import_json(self, json_file):
+        """Import vaults and archives from a JSON state file."""
+        try:
+            with open(json_file, 'rb') as f:
+                state = json.load(f)
+        except json.JSONDecodeError:
+            logger.error("Error reading state file %s. Creating new state.",
+                         json_file)
+            return
+
+        with self.batch():
+            for vault_id, vault_data in state.items():
+                job_updated = vault_data.get("job_updated")
+                job_updated_epoch = vault_data.get("job_updated_epoch")
+                if job_updated and not job_updated_epoch:
+                    job_updated_epoch = datetime.fromisoformat(
+                        job_updated).timestamp()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO vaults VALUES (?, ?, ?, ?, ?, ?)",
+                    (vault_id, vault_data.get("job_id"), vault_data.get("status"),
+                     job_updated, job_updated_epoch,
+                     vault_data.get("last_polled")))
+                # Archives were stored as dicts before the compact
+                # [id, description, size] form
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?)",
+                    ((vault_id, archive['id'], archive['description'], archive['size'])
+                     if isinstance(archive, dict) else (vault_id, *archive)
+                     for archive in vault_data.get("archives", [])))
+        logger.info("Imported state from %s into %s",
+                    json_file, self.state_file)
+
+    def close(self):
+        """Close the database, folding the write-ahead log back into it."""
+        with self.lock:
+            self.conn.close()
+
+    @contextmanager
+    def batch(self):
+        """Group changes into a single transaction, committed when the outermost batch exits."""
+        with self.lock:
+            if self._batch_depth == 0:
+                self.conn.execute("BEGIN")
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.execute("COMMIT")
+                    logger.debug("State saved to %s", self.state_file)
+
+    def get_vaults(self):
+        """Return all tracked vaults as dicts, without their archives."""
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(
+                "SELECT * FROM vaults ORDER BY vault_id")]
+
+    def get_vault(self, vault_id):
+        """Return a tracked vault as a dict, or None if it isn't tracked."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM vaults WHERE vault_id = ?", (vault_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_archives(self, vault_id):
+        """Return a vault's remaining archives as (id, description, size) tuples."""
+        with self.lock:
+            return [tuple(row) for row in self.conn.execute(
+                "SELECT archive_id, description, size FROM archives WHERE vault_id = ?",
+                (vault_id,))]
+
+    def count_archives(self):
+        """Return the number of archives remaining in each vault that has any."""
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT vault_id, COUNT(*) FROM archives GROUP BY vault_id"))
 
     def add_vault(self, vault_id):
         """Add a new vault to track."""
-        if vault_id not in self.state:
-            self.state[vault_id] = {
-                "job_id": None,
-                "status": None,
-                "job_updated": None,
-                "archives": []
-            }
-            self.save_state()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO vaults (vault_id) VALUES (?)", (vault_id,))
 
     def update_vault_job(self, vault_id, job_id, status):
         """Update job information for a vault."""
-        if vault_id in self.state:
-            self.state[vault_id]["job_id"] = job_id
-            self.state[vault_id]["status"] = status
-            self.state[vault_id]["job_updated"] = datetime.now(
-                timezone.utc).isoformat()
-            self.save_state()
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            # The ISO string is for display; the epoch value is for age checks
+            self.conn.execute(
+                "UPDATE vaults SET job_id = ?, status = ?, job_updated = ?, "
+                "job_updated_epoch = ? WHERE vault_id = ?",
+                (job_id, status, now.isoformat(), now.timestamp(), vault_id))
+
+    def mark_pending_deletion(self, vault_id, clear_archives=True):
+        """Mark a vault as waiting for deletion. Its archive list is dropped
+        unless clear_archives is False, which keeps archives that still need
+        deleting on record."""
+        with self.lock, self.batch():
+            self.update_vault_job(vault_id, None, "pending_deletion")
+            if clear_archives:
+                self.conn.execute(
+                    "DELETE FROM archives WHERE vault_id = ?", (vault_id,))
+
+    def update_last_polled(self, vault_id):
+        """Record when a vault's job status was last checked."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE vaults SET last_polled = ? WHERE vault_id = ?",
+                (time.time(), vault_id))
 
     def update_vault_archives(self, vault_id, archives):
-        """Update archive list for a vault."""
-        if vault_id in self.state:
-            self.state[vault_id]["archives"] = archives
-            self.save_state()
+        """Replace a vault's archive list with (id, description, size) entries."""
+        with self.lock, self.batch():
+            self.conn.execute(
+                "DELETE FROM archives WHERE vault_id = ?", (vault_id,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?)",
+                ((vault_id, *archive) for archive in archives))
+
+    def remove_archives(self, vault_id, archive_ids):
+        """Drop deleted archives from a vault's archive list.
+        Commits immediately, even inside a batch, as this records progress."""
+        with self.lock:
+            self.conn.executemany(
+                "DELETE FROM archives WHERE vault_id = ? AND archive_id = ?",
+                ((vault_id, archive_id) for archive_id in archive_ids))
+            if self._batch_depth:
+                self.conn.execute("COMMIT")
+                self.conn.execute("BEGIN")
+
+    def remove_vault(self, vault_id):
+        """Stop tracking a vault that has been deleted."""
+        with self.lock, self.batch():
+            self.conn.execute(
+                "DELETE FROM archives WHERE vault_id = ?", (vault_id,))
+            self.conn.execute(
+                "DELETE FROM vaults WHERE vault_id = ?", (vault_id,))
 
 
 class GlacierCleanup:
-    def __init__(self, state_manager, region_name=None):
-        """Initialize Glacier client with state manager."""
-        region_name = region_name or os.getenv(
-            'AWS_DEFAULT_REGION', 'us-east-1')
+    def __init__(self, state_manager, aws_config, region_name=None,
+                 max_parallel=MAX_ARCHIVE_WORKERS):
+        """Initialize Glacier client with state manager and an AwsConfig."""
+        region_name = region_name or aws_config.region or 'us-east-1'
         self.state_manager = state_manager
-
-        session = boto3.Session(
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            aws_session_token=os.getenv('AWS_SESSION_TOKEN'),
-            region_name=region_name
+        self.max_parallel = max_parallel
+        # All vaults share one pool for archive deletes, so the number of
+        # threads and deletes in flight stays at max_parallel no matter how
+        # many vaults are processed at once
+        self._archive_executor = ThreadPoolExecutor(
+            max_workers=max_parallel, thread_name_prefix='delete-archive')
+        # Set on interrupt so vault workers stop issuing deletes
+        self._stop = threading.Event()
+
+        self._session = aws_config.create_session(region_name)
+        # Sessions aren't thread-safe, so clients are created one at a time
+        self._session_lock = threading.Lock()
+        self._local = threading.local()
+
+        # Each thread has its own client, so the default connection pool is
+        # already one per worker. Keep connections alive so deletes reuse
+        # them, let adaptive retries absorb throttling, and time out stalled
+        # connections so they are retried instead of hanging a worker.
+        # Request parameters all come from Glacier's own responses, so skip
+        # client-side validation on every call.
+        self._config = Config(
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            tcp_keepalive=True,
+            connect_timeout=CONNECT_TIMEOUT,
+            read_timeout=READ_TIMEOUT,
+            parameter_validation=False
         )
-
-        self.glacier = session.client('glacier')
-        logger.debug("Initialized Glacier client in region: %s", region_name)
+        logger.debug("Initialized Glacier session in region: %s (max parallel: %d)",
+                     region_name, max_parallel)
+
+    def close(self):
+        """Shut down the archive delete workers, dropping queued deletes."""
+        self._archive_executor.shutdown(cancel_futures=True)
+
+    @property
+    def glacier(self):
+        """Glacier client for the current thread, created on first use."""
+        client = getattr(self._local, 'glacier', None)
+        if client is None:
+            # Each worker thread gets its own client so they don't contend
+            # on a shared client's internal locks
+            with self._session_lock:
+                client = self._session.client('glacier', config=self._config)
+            self._local.glacier = client
+        return client
+
+    def iter_vaults(self):
+        """Yield the name of each Glacier vault as its page arrives."""
+        paginator = self.glacier.get_paginator('list_vaults')
+
+        # ListVaults returns 10 vaults per page by default; an account holds
+        # at most 1,000 vaults per region, so this is a single request
+        for page in paginator.paginate(PaginationConfig={'PageSize': 1000}):
+            for vault in page.get('VaultList', []):
+                yield vault['VaultName']
 
     def list_vaults(self):
         """List and record all Glacier vaults."""
         try:
             vaults = []
-            paginator = self.glacier.get_paginator('list_vaults')
-
-            for page in paginator.paginate():
-                for vault in page.get('VaultList', []):
-                    vault_name = vault['VaultName']
+            with self.state_manager.batch():
+                for vault_name in self.iter_vaults():
                     self.state_manager.add_vault(vault_name)
                     vaults.append(vault_name)
 
@@ -177,15 +464,29 @@ class GlacierCleanup:
             raise
 
     def initiate_inventory_jobs(self):
-        """Start inventory jobs for vaults without active jobs."""
-        for vault_id, vault_data in self.state_manager.state.items():
-            if not vault_data["job_id"] or vault_data["status"] in ["error", "complete"]:
+        """Start inventory jobs for vaults without an active or completed job."""
+        # Completed inventories are already stored in the state file, so
+        # don't pay for another multi-hour job to retrieve them again. Vaults
+        # pending deletion have no job ID but are past needing an inventory.
+        vaults_to_start = [
+            vault_data["vault_id"] for vault_data in self.state_manager.get_vaults()
+            if vault_data["status"] is None or vault_data["status"] == "error"
+        ]
+        if not vaults_to_start:
+            return
+
+        # Each request is a network round-trip, so issue them concurrently
+        # and record the results as they come back
+        with self.state_manager.batch(), \
+                ThreadPoolExecutor(max_workers=min(len(vaults_to_start), MAX_VAULT_WORKERS)) as executor:
+            futures = {
+                executor.submit(self._initiate_job, vault_id): vault_id
+                for vault_id in vaults_to_start
+            }
+            for future in as_completed(futures):
+                vault_id = futures[future]
                 try:
-                    response = self.glacier.initiate_job(
-                        vaultName=vault_id,
-                        jobParameters={'Type': 'inventory-retrieval'}
-                    )
-                    job_id = response['jobId']
+                    job_id = future.result()
                     self.state_manager.update_vault_job(
                         vault_id, job_id, "in-progress")
                     logger.info(
@@ -196,37 +497,100 @@ class GlacierCleanup:
                     self.state_manager.update_vault_job(
                         vault_id, None, "error")
 
-    def check_job_status(self):
-        """Check status of all in-progress jobs."""
-        jobs_checked = 0
-        for vault_id, vault_data in self.state_manager.state.items():
-            if vault_data["status"] == "in-progress" and vault_data["job_id"]:
-                try:
-                    response = self.glacier.describe_job(
-                        vaultName=vault_id,
-                        jobId=vault_data["job_id"]
-                    )
-                    jobs_checked += 1
-
-                    # Update the job timestamp even if not complete
-                    self.state_manager.update_vault_job(
-                        vault_id, vault_data["job_id"], "in-progress")
-
-                    logger.info("Checking job %s for vault %s: %s",
-                                vault_data["job_id"],
-                                vault_id,
-                                "COMPLETED" if response['Completed'] else "IN PROGRESS")
-
-                    if response['Completed']:
-                        self.get_job_output(vault_id, vault_data["job_id"])
-                except ClientError as e:
-                    logger.error("Error checking job %s for vault %s: %s",
-                                 vault_data["job_id"], vault_id, str(e))
-                    self.state_manager.update_vault_job(
-                        vault_id, vault_data["job_id"], "error")
-
-        if jobs_checked == 0:
-            logger.info("No in-progress jobs to check")
+    def _initiate_job(self, vault_id):
+        """Start an inventory job for a vault and return its job ID."""
+        return self.glacier.initiate_job(
+            vaultName=vault_id,
+            jobParameters={'Type': 'inventory-retrieval'}
+        )['jobId']
+
+    def check_job_status(self, min_poll_interval=MIN_POLL_INTERVAL):
+        """Check status of all in-progress jobs and return how many are still running.
+        Jobs checked less than min_poll_interval seconds ago are skipped."""
+        current_time = time.time()
+        jobs = []
+        skipped = 0
+        for vault_data in self.state_manager.get_vaults():
+            if vault_data["status"] != "in-progress" or not vault_data["job_id"]:
+                continue
+            last_polled = vault_data["last_polled"]
+            if last_polled and current_time - last_polled < min_poll_interval:
+                skipped += 1
+                continue
+            jobs.append((vault_data["job_updated_epoch"] or 0,
+                         vault_data["vault_id"], vault_data["job_id"]))
+
+        if skipped:
+            logger.info("Skipping %d jobs checked within the last %d seconds",
+                        skipped, min_poll_interval)
+        if not jobs:
+            if not skipped:
+                logger.info("No in-progress jobs to check")
+            return skipped
+
+        # Check the longest-running jobs first, as they're the most likely
+        # to have finished
+        jobs.sort()
+
+        # Jobs are checked and their output fetched concurrently; each
+        # vault's errors are handled in _check_job so one failure doesn't
+        # affect the others
+        with self.state_manager.batch(), \
+                ThreadPoolExecutor(max_workers=min(len(jobs), MAX_VAULT_WORKERS)) as executor:
+            futures = [executor.submit(self._check_job, vault_id, job_id)
+                       for _, vault_id, job_id in jobs]
+            return skipped + sum(1 for future in futures if future.result())
+
+    def _check_job(self, vault_id, job_id):
+        """Check a single inventory job, fetching its output once complete.
+        Returns True if the job is still running."""
+        try:
+            response = self.glacier.describe_job(
+                vaultName=vault_id,
+                jobId=job_id
+            )
+            # Only record when the job was polled; job_updated keeps the
+            # submission time so the 24-hour expiry check stays accurate
+            self.state_manager.update_last_polled(vault_id)
+
+            logger.info("Checking job %s for vault %s: %s",
+                        job_id,
+                        vault_id,
+                        "COMPLETED" if response['Completed'] else "IN PROGRESS")
+
+            if response['Completed']:
+                self.get_job_output(vault_id, job_id)
+                return False
+            return True
+        except ClientError as e:
+            if get_error_code(e) == 'ThrottlingException':
+                # The job itself is fine; check it again next time
+                logger.warning("Throttled checking job %s for vault %s",
+                               job_id, vault_id)
+                return True
+            logger.error("Error checking job %s for vault %s: %s",
+                         job_id, vault_id, str(e))
+            self.state_manager.update_vault_job(vault_id, job_id, "error")
+            return False
+        except (BotoCoreError, ijson.JSONError) as e:
+            # Timeouts and truncated inventory bodies are transient; leave
+            # the job in progress so its output is fetched again next time
+            logger.warning("Error reading job %s for vault %s, will retry: %s",
+                           job_id, vault_id, str(e))
+            return True
+
+    def wait_for_jobs(self):
+        """Poll in-progress jobs until all have finished, backing off between checks."""
+        attempt = 0
+        # The backoff below paces the checks, so don't skip recently polled jobs
+        while self.check_job_status(min_poll_interval=0):
+            # Capped exponential backoff with jitter so polling slows down
+            # over the multi-hour life of an inventory job
+            delay = min(MAX_POLL_DELAY, INITIAL_POLL_DELAY * 2 ** attempt)
+            delay *= random.uniform(0.8, 1.2)
+            logger.info("Waiting %.0f seconds before checking jobs again", delay)
+            time.sleep(delay)
+            attempt += 1
 
     def get_job_output(self, vault_id, job_id):
         """Get and store output from completed inventory job."""
@@ -235,14 +599,18 @@ class GlacierCleanup:
                 vaultName=vault_id,
                 jobId=job_id
             )
-            inventory = json.loads(response['body'].read())
+            # Stream archives out of the inventory body instead of reading
+            # and decoding the whole document into memory first
+            logger.debug("Parsing inventory for vault %s with ijson %s backend",
+                         vault_id, ijson.backend)
+            # Each archive is kept as a compact (id, description, size) tuple
+            # rather than a dict; large inventories hold millions of them
             archives = [
-                {
-                    'id': archive['ArchiveId'],
-                    'description': archive.get('ArchiveDescription', ''),
-                    'size': archive['Size']
-                }
-                for archive in inventory.get('ArchiveList', [])
+                (archive['ArchiveId'],
+                 archive.get('ArchiveDescription', ''),
+                 archive['Size'])
+                for archive in ijson.items(response['body'], 'ArchiveList.item',
+                                           buf_size=INVENTORY_READ_SIZE)
             ]
             self.state_manager.update_vault_archives(vault_id, archives)
             self.state_manager.update_vault_job(vault_id, job_id, "complete")
@@ -255,84 +623,219 @@ class GlacierCleanup:
 
     def process_completed_jobs(self):
         """Process vaults with completed inventory jobs older than 24 hours or pending deletions."""
-        current_time = datetime.now(timezone.utc)
-
-        # Make a list of vault IDs to avoid modification during iteration
-        vault_ids = list(self.state_manager.state.keys())
-
-        for vault_id in vault_ids:
-            vault_data = self.state_manager.state.get(vault_id)
-            if not vault_data:
+        current_time = time.time()
+
+        vault_ids = [vault_data["vault_id"]
+                     for vault_data in self.state_manager.get_vaults()]
+        if not vault_ids:
+            return
+
+        # Vaults are independent, so process them in parallel and report
+        # any failures once all of them have finished
+        failures = []
+        with self.state_manager.batch(), \
+                ThreadPoolExecutor(max_workers=min(len(vault_ids), MAX_VAULT_WORKERS)) as executor:
+            try:
+                futures = {
+                    executor.submit(self._process_vault, vault_id, current_time): vault_id
+                    for vault_id in vault_ids
+                }
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        failures.append((futures[future], future.exception()))
+            except BaseException:
+                # On Ctrl-C, drop vaults that haven't started and tell the
+                # running ones to stop; each cancels its own queued deletes
+                # and waits only for requests already in flight
+                self._stop.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        for vault_id, error in failures:
+            logger.error("Error processing vault %s: %s", vault_id, str(error))
+
+    def _process_vault(self, vault_id, current_time):
+        """Advance a single vault through archive and vault deletion."""
+        if self._stop.is_set():
+            return
+        vault_data = self.state_manager.get_vault(vault_id)
+        if not vault_data:
+            return
+
+        if vault_data["status"] == "pending_deletion":
+            # Archives whose delete failed last time are kept in state; the
+            # vault can't empty until they're gone, so retry them first
+            remaining = self.state_manager.get_archives(vault_id)
+            if remaining:
+                logger.info("Retrying %d archives left in vault %s",
+                            len(remaining), vault_id)
+                self.delete_vault_contents(vault_id, remaining)
+                return
+
+            # Glacier refuses the deletion until its own inventory of the vault
+            # is empty, so retry as soon as that happens instead of waiting a
+            # fixed 24 hours
+            try:
+                response = self.glacier.describe_vault(vaultName=vault_id)
+            except ClientError as e:
+                if get_error_code(e) == 'ResourceNotFoundException':
+                    logger.info("Vault %s already deleted", vault_id)
+                    self.state_manager.remove_vault(vault_id)
+                    return
+                raise
+
+            if response['NumberOfArchives'] == 0:
+                logger.info(
+                    "Vault %s inventory is empty, retrying deletion", vault_id)
+                # Empty archives list since they should be deleted
+                self.delete_vault_contents(vault_id, [])
+            else:
+                logger.info("Waiting for vault %s inventory to reflect deleted archives (%d archives listed, last inventory %s)",
+                            vault_id, response['NumberOfArchives'],
+                            response.get('LastInventoryDate', 'never'))
+
+        elif vault_data["status"] == "complete" and vault_data["job_updated_epoch"]:
+            hours_elapsed = (
+                current_time - vault_data["job_updated_epoch"]) / 3600
+
+            if hours_elapsed >= 24:
+                logger.info(
+                    "Processing vault %s (%.1f hours elapsed)", vault_id, hours_elapsed)
+                self.delete_vault_contents(
+                    vault_id, self.state_manager.get_archives(vault_id))
+            else:
+                logger.info("Waiting for 24-hour period before processing vault %s (%.1f hours elapsed)",
+                            vault_id, hours_elapsed)
+
+    def delete_archive(self, vault_id, archive_id):
+        """Delete a single archive from a vault. Returns True if the archive is gone."""
+        try:
+            self.glacier.delete_archive(
+                vaultName=vault_id,
+                archiveId=archive_id
+            )
+            logger.debug("Deleted archive %s from vault %s",
+                         archive_id, vault_id)
+            return True
+        except ClientError as e:
+            code = get_error_code(e)
+            if code == 'ResourceNotFoundException':
+                # Deletes are idempotent, so an archive that is already gone
+                # counts as deleted
+                logger.debug("Archive %s already deleted from vault %s",
+                             archive_id, vault_id)
+                return True
+            if code in RETRYABLE_ERROR_CODES:
+                # Still failing after the client's retries; stop this vault
+                # and pick it up again on the next run
+                raise
+            logger.error("Error deleting archive %s: %s",
+                         archive_id, str(e))
+            return False
+
+    @staticmethod
+    def _pop_deleted(done, pending, deleted):
+        """Remove finished futures from pending and add the IDs they deleted
+        to deleted. Every future is collected before the first error, if
+        any, is raised."""
+        error = None
+        for future in done:
+            archive_id = pending.pop(future)
+            if future.cancelled():
                 continue
-
-            if vault_data["status"] == "pending_deletion":
-                # For pending deletions, check if 24 hours have passed since last attempt
-                if vault_data["job_updated"]:
-                    job_time = datetime.fromisoformat(
-                        vault_data["job_updated"])
-                    hours_elapsed = (
-                        current_time - job_time).total_seconds() / 3600
-
-                    if hours_elapsed >= 24:
-                        logger.info(
-                            "Retrying deletion for vault %s after %.1f hours", vault_id, hours_elapsed)
-                        # Empty archives list since they should be deleted
-                        self.delete_vault_contents(vault_id, [])
-                    else:
-                        logger.info("Waiting for 24-hour period before retrying vault %s deletion (%.1f hours elapsed)",
-                                    vault_id, hours_elapsed)
-
-            elif vault_data["status"] == "complete" and vault_data["job_updated"]:
-                job_time = datetime.fromisoformat(vault_data["job_updated"])
-                hours_elapsed = (
-                    current_time - job_time).total_seconds() / 3600
-
-                if hours_elapsed >= 24:
-                    logger.info(
-                        "Processing vault %s (%.1f hours elapsed)", vault_id, hours_elapsed)
-                    self.delete_vault_contents(
-                        vault_id, vault_data["archives"])
-                else:
-                    logger.info("Waiting for 24-hour period before processing vault %s (%.1f hours elapsed)",
-                                vault_id, hours_elapsed)
+            try:
+                if future.result():
+                    deleted.append(archive_id)
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
 
     def delete_vault_contents(self, vault_id, archives):
         """Delete archives and attempt vault deletion."""
+        failed = 0
         try:
-            for archive in archives:
+            # Deletes run on the shared archive executor, where each worker
+            # thread uses its own client
+            if archives:
+                # Cap the number of queued deletes instead of creating a
+                # future per archive up front
+                pending = {}
+                deleted = []
+                deleted_count = 0
+                last_saved = time.monotonic()
                 try:
-                    self.glacier.delete_archive(
-                        vaultName=vault_id,
-                        archiveId=archive['id']
-                    )
-                    logger.info("Deleted archive %s from vault %s",
-                                archive['id'], vault_id)
-                except ClientError as e:
-                    if 'ResourceNotFoundException' in str(e):
-                        logger.info("Archive %s already deleted from vault %s",
-                                    archive['id'], vault_id)
-                    else:
-                        logger.error("Error deleting archive %s: %s",
-                                     archive['id'], str(e))
+                    for archive_id, _, _ in archives:
+                        if self._stop.is_set():
+                            break
+                        if len(pending) >= self.max_parallel * 2:
+                            done, _ = wait(
+                                pending, return_when=FIRST_COMPLETED)
+                            self._pop_deleted(done, pending, deleted)
+                        pending[self._archive_executor.submit(
+                            self.delete_archive, vault_id, archive_id)] = archive_id
+
+                        # Periodically record progress so an interrupted run
+                        # doesn't repeat deletes that already succeeded
+                        if deleted and time.monotonic() - last_saved >= PROGRESS_SAVE_INTERVAL:
+                            deleted_count += len(deleted)
+                            self.state_manager.remove_archives(
+                                vault_id, deleted)
+                            deleted = []
+                            last_saved = time.monotonic()
+
+                    if not self._stop.is_set():
+                        wait(pending)
+                        self._pop_deleted(list(pending), pending, deleted)
+                finally:
+                    if pending:
+                        # Stopping early; drop deletes that haven't started
+                        # and record the ones still in flight. Any error that
+                        # stopped us is already raised. Cancelled futures
+                        # never complete a wait(), so only wait on the rest.
+                        for future in pending:
+                            future.cancel()
+                        wait([future for future in pending
+                              if not future.cancelled()])
+                        try:
+                            self._pop_deleted(list(pending), pending, deleted)
+                        except Exception:
+                            pass
+                    if deleted:
+                        deleted_count += len(deleted)
+                        self.state_manager.remove_archives(vault_id, deleted)
+
+                if self._stop.is_set():
+                    logger.info("Interrupted after deleting %d archives from vault %s",
+                                deleted_count, vault_id)
+                    return
+
+                # Per-archive results are logged at debug level; summarise
+                # the vault here instead
+                logger.info("Deleted %d/%d archives from vault %s",
+                            deleted_count, len(archives), vault_id)
+                failed = len(archives) - deleted_count
+                if failed:
+                    logger.warning("%d archives in vault %s could not be deleted and remain in the state file",
+                                   failed, vault_id)
 
             # After deleting archives, attempt to delete the vault
             try:
                 self.glacier.delete_vault(vaultName=vault_id)
                 logger.info("Successfully deleted vault %s", vault_id)
                 # Remove the vault from state since it's been deleted
-                if vault_id in self.state_manager.state:
-                    del self.state_manager.state[vault_id]
-                    self.state_manager.save_state()
+                self.state_manager.remove_vault(vault_id)
             except ClientError as e:
-                if 'ResourceNotFoundException' in str(e):
+                code = get_error_code(e)
+                if code == 'ResourceNotFoundException':
                     logger.info("Vault %s already deleted", vault_id)
-                    if vault_id in self.state_manager.state:
-                        del self.state_manager.state[vault_id]
-                        self.state_manager.save_state()
-                elif 'InvalidParameterValueException' in str(e) and 'cannot be deleted until' in str(e):
+                    self.state_manager.remove_vault(vault_id)
+                elif code == 'InvalidParameterValueException' and 'cannot be deleted until' in str(e):
                     # Vault not empty or recent archive deletions, mark for pending deletion
-                    self.state_manager.update_vault_job(
-                        vault_id, None, "pending_deletion")
+                    # Keep any archives that failed to delete on record
+                    self.state_manager.mark_pending_deletion(
+                        vault_id, clear_archives=not failed)
                     logger.info(
                         "Marked vault %s for deletion (waiting for archive deletions to complete)", vault_id)
                 else:
@@ -343,6 +846,17 @@ class GlacierCleanup:
             logger.error("Error processing vault %s: %s", vault_id, str(e))
 
 
+def positive_int(value):
+    """argparse type for options that need a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(
@@ -350,12 +864,20 @@ def main():
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug logging')
     parser.add_argument('--log-file', help='Path to log file')
-    parser.add_argument('--state-file', default='glacier_state.json',
-                        help='Path to state file (default: glacier_state.json)')
+    parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                        help=f'Path to state database (default: {DEFAULT_STATE_FILE})')
     parser.add_argument('--scan', action='store_true',
                         help='Scan for new vaults and initiate inventory jobs')
     parser.add_argument('--status', action='store_true',
                         help='Show current status of all vaults and jobs')
+    parser.add_argument('--wait', action='store_true',
+                        help='Keep checking in-progress jobs until they all finish')
+    parser.add_argument('--region',
+                        help='AWS region to clean up (default: AWS_DEFAULT_REGION or us-east-1)')
+    parser.add_argument('--expect-account',
+                        help='Abort unless the credentials belong to this AWS account ID')
+    parser.add_argument('--max-parallel', type=positive_int, default=MAX_ARCHIVE_WORKERS,
+                        help=f'Number of archives to delete concurrently across all vaults (default: {MAX_ARCHIVE_WORKERS})')
     args = parser.parse_args()
 
     try:
@@ -363,42 +885,71 @@ def main():
         setup_logging(args.debug, args.log_file)
 
         # Load AWS credentials
-        if not load_aws_credentials():
+        aws_config = load_aws_credentials()
+        if not aws_config:
             logger.error("Failed to load AWS credentials")
             return 1
 
-        # Initialize state manager and cleanup
-        state_manager = GlacierStateManager(args.state_file)
-        cleanup = GlacierCleanup(state_manager)
-
-        # If scan flag is set, scan for new vaults
-        if args.scan:
-            cleanup.list_vaults()
-            cleanup.initiate_inventory_jobs()
-
-        # Always check existing jobs and process completed ones
-        cleanup.check_job_status()
-        cleanup.process_completed_jobs()
-
-        # Show status if requested
-        if args.status:
-            logger.info("\nCurrent Status:")
-            for vault_id, vault_data in state_manager.state.items():
-                status = vault_data["status"] or "not started"
-                job_id = vault_data["job_id"] or "no job"
-                updated = vault_data["job_updated"] or "never"
-                if updated != "never":
-                    # Convert UTC timestamp to local time for display
-                    updated_dt = datetime.fromisoformat(
-                        updated).replace(tzinfo=timezone.utc)
-                    updated = updated_dt.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')
-                archive_count = len(vault_data.get("archives", []))
-                logger.info(f"Vault: {vault_id}")
-                logger.info(f"  Status: {status}")
-                logger.info(f"  Job ID: {job_id}")
-                logger.info(f"  Last Updated: {updated}")
-                logger.info(f"  Archives: {archive_count}")
-                logger.info("")
+        # Fail fast on bad credentials or the wrong account before touching
+        # the state file or any vaults
+        try:
+            account_id = get_account_id(aws_config, args.region)
+        except (BotoCoreError, ClientError) as e:
+            logger.error("Could not verify AWS credentials: %s", str(e))
+            return 1
+        logger.info("Using AWS account %s", account_id)
+        if args.expect_account and account_id != args.expect_account:
+            logger.error("Credentials belong to account %s, expected %s",
+                         account_id, args.expect_account)
+            return 1
+
+        # Initialize state manager and cleanup. Only the default database
+        # picks up the old default JSON file; a custom --state-file (e.g.
+        # one per region) must not inherit another run's vaults
+        legacy_state_file = (LEGACY_STATE_FILE
+                             if args.state_file == DEFAULT_STATE_FILE else None)
+        # Close the database and stop the delete workers however the run
+        # ends
+        with closing(GlacierStateManager(
+                args.state_file, legacy_state_file=legacy_state_file)) as state_manager, \
+                closing(GlacierCleanup(
+                    state_manager, aws_config, region_name=args.region,
+                    max_parallel=args.max_parallel)) as cleanup:
+            # If scan flag is set, scan for new vaults
+            if args.scan:
+                cleanup.list_vaults()
+                cleanup.initiate_inventory_jobs()
+
+            # Always check existing jobs and process completed ones
+            if args.wait:
+                cleanup.wait_for_jobs()
+            else:
+                cleanup.check_job_status()
+            cleanup.process_completed_jobs()
+
+            # Show status if requested
+            if args.status:
+                archive_counts = state_manager.count_archives()
+                lines = ["", "Current Status:"]
+                for vault_data in state_manager.get_vaults():
+                    vault_id = vault_data["vault_id"]
+                    status = vault_data["status"] or "not started"
+                    job_id = vault_data["job_id"] or "no job"
+                    updated = "never"
+                    if vault_data["job_updated_epoch"]:
+                        # Convert the cached UTC epoch to local time for display
+                        updated = time.strftime('%Y-%m-%d %H:%M:%S %Z',
+                                                time.localtime(vault_data["job_updated_epoch"]))
+                    lines.extend([
+                        f"Vault: {vault_id}",
+                        f"  Status: {status}",
+                        f"  Job ID: {job_id}",
+                        f"  Last Updated: {updated}",
+                        f"  Archives: {archive_counts.get(vault_id, 0)}",
+                        "",
+                    ])
+                # Emit the report as one record rather than one per line
+                logger.info("%s", "\n".join(lines))
 
         logger.info("Command completed")
 
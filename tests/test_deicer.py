@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+import deicer
+
+
+def client_error(code, message='error'):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, 'Op')
+
+
+class FakeGlacier:
+    """Just enough of the Glacier client for archive and vault deletion."""
+
+    def __init__(self, archives, fail=()):
+        self.archives = set(archives)
+        self.fail = dict(fail)
+        self.deleted_vaults = []
+        self.lock = threading.Lock()
+
+    def delete_archive(self, vaultName, archiveId):
+        if archiveId in self.fail:
+            raise client_error(self.fail[archiveId])
+        with self.lock:
+            self.archives.discard(archiveId)
+        return {}
+
+    def delete_vault(self, vaultName):
+        if self.archives:
+            raise client_error('InvalidParameterValueException',
+                               'Vault not empty: cannot be deleted until empty')
+        self.deleted_vaults.append(vaultName)
+        return {}
+
+
+class StateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def open_state(self, name='state.db', **kwargs):
+        state_manager = deicer.GlacierStateManager(self.path(name), **kwargs)
+        self.addCleanup(state_manager.close)
+        return state_manager
+
+
+class ImportJsonTest(StateTestCase):
+    legacy_state = {
+        'old': {'job_id': 'job-1', 'status': 'complete',
+                'job_updated': '2024-01-01T00:00:00+00:00',
+                'archives': [{'id': 'a1', 'description': 'd', 'size': 1}]},
+        'new': {'job_id': 'job-2', 'status': 'complete',
+                'job_updated': '2024-01-01T00:00:00+00:00',
+                'archives': [['b1', 'd', 2], ['b2', 'd', 3]]},
+    }
+
+    def write_json(self, name):
+        with open(self.path(name), 'w') as f:
+            json.dump(self.legacy_state, f)
+
+    def test_imports_legacy_file_into_new_database(self):
+        self.write_json('legacy.json')
+        state_manager = self.open_state(
+            legacy_state_file=self.path('legacy.json'))
+
+        self.assertEqual(state_manager.count_archives(), {'old': 1, 'new': 2})
+        vault = state_manager.get_vault('old')
+        self.assertEqual(vault['status'], 'complete')
+        self.assertEqual(vault['job_updated_epoch'], 1704067200.0)
+        self.assertTrue(os.path.exists(self.path('legacy.json')))
+
+    def test_converts_json_state_file_in_place(self):
+        self.write_json('state.db')
+        state_manager = self.open_state()
+
+        self.assertEqual(state_manager.get_archives('old'), [('a1', 'd', 1)])
+        with open(self.path('state.db.bak')) as f:
+            self.assertEqual(json.load(f), self.legacy_state)
+
+    def test_existing_database_ignores_legacy_file(self):
+        self.open_state().close()
+        self.write_json('legacy.json')
+        state_manager = self.open_state(
+            legacy_state_file=self.path('legacy.json'))
+
+        self.assertEqual(state_manager.get_vaults(), [])
+
+
+class BatchTest(StateTestCase):
+    def other_connection_count(self):
+        conn = sqlite3.connect(self.path('state.db'))
+        try:
+            return conn.execute("SELECT COUNT(*) FROM archives").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_remove_archives_commits_inside_nested_batch(self):
+        state_manager = self.open_state()
+        state_manager.add_vault('v1')
+        state_manager.update_vault_archives(
+            'v1', [('a1', '', 1), ('a2', '', 1), ('a3', '', 1)])
+
+        with state_manager.batch():
+            with state_manager.batch():
+                state_manager.remove_archives('v1', ['a1'])
+                # Progress is visible to other readers straight away
+                self.assertEqual(self.other_connection_count(), 2)
+                state_manager.remove_archives('v1', ['a2'])
+            self.assertEqual(self.other_connection_count(), 1)
+            state_manager.add_vault('v2')
+
+        self.assertEqual(state_manager.get_archives('v1'), [('a3', '', 1)])
+        self.assertEqual([vault['vault_id'] for vault in state_manager.get_vaults()],
+                         ['v1', 'v2'])
+
+
+class DeleteVaultContentsTest(StateTestCase):
+    archives = [('a%02d' % i, '', 1) for i in range(20)]
+
+    def run_cleanup(self, state_manager, fake):
+        cleanup = deicer.GlacierCleanup(
+            state_manager, deicer.AwsConfig('key', 'secret'), max_parallel=2)
+        self.addCleanup(cleanup.close)
+        with mock.patch.object(deicer.GlacierCleanup, 'glacier',
+                               new_callable=mock.PropertyMock,
+                               return_value=fake):
+            cleanup.delete_vault_contents(
+                'v1', state_manager.get_archives('v1'))
+
+    def test_resumes_after_retryable_error(self):
+        state_manager = self.open_state()
+        state_manager.add_vault('v1')
+        state_manager.update_vault_archives('v1', self.archives)
+
+        fake = FakeGlacier([archive[0] for archive in self.archives],
+                           fail={'a05': 'ThrottlingException'})
+        with self.assertLogs(deicer.logger, 'ERROR'):
+            self.run_cleanup(state_manager, fake)
+
+        # Deletes that succeeded before the throttle are recorded, and the
+        # vault is left for the next run
+        remaining = [archive[0] for archive in state_manager.get_archives('v1')]
+        self.assertIn('a05', remaining)
+        self.assertLess(len(remaining), len(self.archives))
+        self.assertEqual(set(remaining), fake.archives)
+        self.assertEqual(fake.deleted_vaults, [])
+
+        fake.fail.clear()
+        self.run_cleanup(state_manager, fake)
+
+        self.assertEqual(fake.deleted_vaults, ['v1'])
+        self.assertIsNone(state_manager.get_vault('v1'))
+
+    def test_keeps_archives_that_failed_to_delete(self):
+        state_manager = self.open_state()
+        state_manager.add_vault('v1')
+        state_manager.update_vault_archives('v1', self.archives)
+
+        fake = FakeGlacier([archive[0] for archive in self.archives],
+                           fail={'a05': 'AccessDeniedException'})
+        with self.assertLogs(deicer.logger, 'WARNING') as logs:
+            self.run_cleanup(state_manager, fake)
+        self.assertIn('1 archives in vault v1 could not be deleted',
+                      '\n'.join(logs.output))
+
+        self.assertEqual(state_manager.get_vault('v1')['status'],
+                         'pending_deletion')
+        self.assertEqual(state_manager.get_archives('v1'), [('a05', '', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()